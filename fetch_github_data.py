@@ -1,5 +1,13 @@
 import requests
 import csv
+import json
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to the standard library
+    _json_loads = json.loads
 
 # Configuration
 REPO_OWNER = "username_or_org"  # Replace with the actual owner of the repo
@@ -7,83 +15,77 @@ REPO_NAME = "repository_name"  # Replace with the actual repository name
 TOKEN = "YOUR_GITHUB_TOKEN"  # Replace with your GitHub token
 BASE_URL = "https://api.github.com/repos/"
 
-def fetch_all_commits(repo_owner, repo_name, token):
-    session = requests.Session()
-    session.headers.update({
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json"
-    })
+# One session for every request so keep-alive reuses the same connection
+SESSION = requests.Session()
+SESSION.headers.update({
+    "Authorization": f"Bearer {TOKEN}",
+    "Accept": "application/vnd.github.v3+json"
+})
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
 
-    all_commits = []
+def iter_commits(repo_owner, repo_name):
     page = 1
     per_page = 100  # Maximum allowed by GitHub API per request
 
     while True:
         url = f"{BASE_URL}{repo_owner}/{repo_name}/commits?page={page}&per_page={per_page}"
-        response = session.get(url)
+        response = SESSION.get(url)
 
         if response.status_code != 200:
-            print(f"Error fetching commits: {response.status_code}, {response.json().get('message')}")
-            break
+            print(f"Error fetching commits: {response.status_code}, {_json_loads(response.content).get('message')}")
+            return
 
-        commits = response.json()
+        commits = _json_loads(response.content)
         if not commits:
-            break
+            return
 
-        # Extract commit messages
+        # Yield commit messages one page at a time
         for commit in commits:
-            commit_message = commit['commit']['message']
-            all_commits.append(commit_message)
+            yield commit['commit']['message']
 
+        # GitHub only sends rel="next" while more pages exist
+        if 'next' not in response.links:
+            return
         page += 1
 
-    return all_commits
-
-def fetch_all_pull_requests(repo_owner, repo_name, token):
-    session = requests.Session()
-    session.headers.update({
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json"
-    })
-
-    all_prs = []
+def iter_pull_requests(repo_owner, repo_name):
     page = 1
     per_page = 100  # Maximum allowed by GitHub API per request
 
     while True:
         url = f"{BASE_URL}{repo_owner}/{repo_name}/pulls?state=all&page={page}&per_page={per_page}"
-        response = session.get(url)
+        response = SESSION.get(url)
 
         if response.status_code != 200:
-            print(f"Error fetching pull requests: {response.status_code}, {response.json().get('message')}")
-            break
+            print(f"Error fetching pull requests: {response.status_code}, {_json_loads(response.content).get('message')}")
+            return
 
-        prs = response.json()
+        prs = _json_loads(response.content)
         if not prs:
-            break
+            return
 
-        # Extract pull request titles
+        # Yield pull request titles one page at a time
         for pr in prs:
-            pr_title = pr['title']
-            all_prs.append(pr_title)
+            yield pr['title']
 
+        # GitHub only sends rel="next" while more pages exist
+        if 'next' not in response.links:
+            return
         page += 1
 
-    return all_prs
-
-# Fetch commits and pull requests
-commits = fetch_all_commits(REPO_OWNER, REPO_NAME, TOKEN)
-pull_requests = fetch_all_pull_requests(REPO_OWNER, REPO_NAME, TOKEN)
-
-# Save to CSV file
+# Stream commits and pull requests straight into the CSV file
 output_file = "commits_and_pull_requests.csv"
+commit_count = 0
+pr_count = 0
 with open(output_file, mode='w', newline='', encoding='utf-8') as file:
     writer = csv.writer(file)
     writer.writerow(["Type", "Message"])  # Header
 
-    for message in commits:
+    for message in iter_commits(REPO_OWNER, REPO_NAME):
         writer.writerow(["Commit", message])
-    for pr_title in pull_requests:
+        commit_count += 1
+    for pr_title in iter_pull_requests(REPO_OWNER, REPO_NAME):
         writer.writerow(["Pull Request", pr_title])
+        pr_count += 1
 
-print(f"Fetched {len(commits)} commits and {len(pull_requests)} pull requests and saved to '{output_file}'.")
+print(f"Fetched {commit_count} commits and {pr_count} pull requests and saved to '{output_file}'.")
@@ -2,20 +2,55 @@ import requests
 import pandas as pd
 from datetime import datetime
 import os
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Set, Tuple, Union
 import logging
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlencode
 import time
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from github_client import GITHUB_DATE_FORMAT, json_loads
+from etag_cache import ETagCache
+
+# Commit history with per-commit stats, fetched 100 commits per request
+COMMIT_HISTORY_QUERY = """
+query($owner: String!, $repo: String!, $cursor: String, $since: GitTimestamp, $until: GitTimestamp) {
+  repository(owner: $owner, name: $repo) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 100, after: $cursor, since: $since, until: $until) {
+            pageInfo {
+              endCursor
+              hasNextPage
+            }
+            nodes {
+              oid
+              message
+              url
+              author {
+                name
+                email
+                date
+              }
+              additions
+              deletions
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
 
 class GitHubDataService:
-    def __init__(self, token: str):
+    def __init__(self, token: str, cache_path: Optional[str] = None):
         """
         Initialize the GitHub data service.
         
         Args:
             token (str): GitHub personal access token for authentication (required)
+            cache_path (str): Optional SQLite file used to persist ETags and pages between runs
         """
         if not token:
             raise ValueError("GitHub token is required for accessing repositories")
@@ -25,8 +60,11 @@ class GitHubDataService:
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        self.cache_path = cache_path
         self.session = self._setup_session()
         self.logger = self._setup_logger()
+        self._etag_cache = ETagCache(cache_path)
+        self._access_cache: Set[Tuple[str, str]] = set()
         
     # [Setup methods remain the same]
     def _setup_session(self) -> requests.Session:
@@ -58,54 +96,87 @@ class GitHubDataService:
         remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
         reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
         
-        if remaining <= 1:
-            wait_time = reset_time - int(time.time())
+        # Only slow down near the ceiling, spreading the last requests over the reset window
+        if remaining < 10:
+            wait_time = reset_time - time.time()
+            if remaining > 0:
+                wait_time /= remaining
             if wait_time > 0:
-                self.logger.warning(f"Rate limit nearly exceeded. Waiting {wait_time} seconds...")
+                self.logger.warning(f"Rate limit nearly exceeded. Waiting {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
 
     def _check_repo_access(self, owner: str, repo: str) -> bool:
         """
         Check if the repository is accessible with current credentials.
+        
+        Successful checks are cached per (owner, repo) for the lifetime of the service.
+        Failures are not, so a transient error is retried on the next call.
         """
+        key = (owner, repo)
+        if key in self._access_cache:
+            return True
+        if not self._probe_repo_access(owner, repo):
+            return False
+        self._access_cache.add(key)
+        return True
+
+    def _probe_repo_access(self, owner: str, repo: str) -> bool:
         url = f"{self.base_url}/repos/{owner}/{repo}"
         response = self.session.get(url)
         
         if response.status_code == 200:
-            repo_data = response.json()
+            repo_data = json_loads(response.content)
             self.logger.info(f"Successfully accessed repository: {repo_data['full_name']}")
             return True
         else:
             self.logger.error(f"Failed to access repository: {response.status_code} - {response.text}")
             return False
 
+    def _cached_get(self, page_url: str) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        GET a page using If-None-Match, returning its data and Link header.
+        
+        page_url carries the full query string, which also keys the cache.
+        Conditional requests answered with 304 do not count against the rate limit
+        and are served from the cache.
+        """
+        cached = self._etag_cache.get(page_url)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
+        response = self.session.get(page_url, headers=headers)
+        self._handle_rate_limit(response)
+        if response.status_code == 304:
+            _, content, links = cached
+            return json_loads(content), links
+        response.raise_for_status()
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache.put(page_url, etag, response.content, response.links)
+        return json_loads(response.content), response.links
+
     def _paginate_github_data(self, url: str, params: Dict = None) -> List[Dict]:
         """
         Generic method to handle GitHub API pagination.
         """
         all_data = []
-        page = 1
         per_page = 100
         
-        if params is None:
-            params = {}
+        # Unset parameters are left out rather than sent as "None"
+        params = {key: value for key, value in (params or {}).items() if value is not None}
         
-        params.update({"per_page": per_page})
+        # Encode the query once for the first page; later pages come from rel="next"
+        page_url = f"{url}?{urlencode(sorted({**params, 'per_page': per_page}.items()))}&page=1"
         
         while True:
-            params["page"] = page
             try:
-                response = self.session.get(url, params=params)
-                self._handle_rate_limit(response)
-                response.raise_for_status()
-                
-                page_data = response.json()
-                if not page_data:
-                    break
-                    
+                page_data, links = self._cached_get(page_url)
                 all_data.extend(page_data)
-                page += 1
-                time.sleep(0.5)  # Be nice to GitHub API
+                # GitHub only sends rel="next" while more pages exist, which saves
+                # requesting one more page just to find it empty
+                if 'next' not in links:
+                    break
+                page_url = links['next']['url']
                 
             except requests.exceptions.RequestException as e:
                 self.logger.error(f"Error fetching data from {url}: {str(e)}")
@@ -113,37 +184,50 @@ class GitHubDataService:
                 
         return all_data
 
+    def _graphql(self, query: str, variables: Dict) -> Dict:
+        """
+        Run a query against the GitHub GraphQL API and return its data.
+        """
+        response = self.session.post(f"{self.base_url}/graphql", json={"query": query, "variables": variables})
+        self._handle_rate_limit(response)
+        response.raise_for_status()
+        
+        payload = json_loads(response.content)
+        if payload.get("errors"):
+            raise Exception(f"GitHub GraphQL error: {payload['errors']}")
+        return payload["data"]
+
     # Commit Methods
     def get_commits(self, owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
         """
-        Fetch all commits from a specific repository with rate limit handling.
+        Fetch all commits, including their stats, from the default branch of a repository.
         """
         if not self._check_repo_access(owner, repo):
             raise Exception("Repository not accessible. Please check your permissions and token.")
             
-        url = f"{self.base_url}/repos/{owner}/{repo}/commits"
-        params = {}
+        variables = {"owner": owner, "repo": repo, "cursor": None, "since": since, "until": until}
+        commits = []
         
-        if since:
-            params["since"] = since
-        if until:
-            params["until"] = until
-            
         self.logger.info(f"Fetching commits from {owner}/{repo}")
-        return self._paginate_github_data(url, params)
-
-    def get_detailed_commit(self, commit_url: str) -> Dict:
-        """
-        Get detailed information about a specific commit.
-        """
-        try:
-            response = self.session.get(commit_url)
-            self._handle_rate_limit(response)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error fetching detailed commit info: {str(e)}")
-            return None
+        while True:
+            try:
+                data = self._graphql(COMMIT_HISTORY_QUERY, variables)
+            except requests.exceptions.RequestException as e:
+                self.logger.error(f"Error fetching commits: {str(e)}")
+                raise
+                
+            branch = data["repository"]["defaultBranchRef"]
+            if branch is None:
+                break  # Empty repository
+                
+            history = branch["target"]["history"]
+            commits.extend(history["nodes"])
+            
+            if not history["pageInfo"]["hasNextPage"]:
+                break
+            variables["cursor"] = history["pageInfo"]["endCursor"]
+            
+        return commits
 
     def process_commits(self, commits: List[Dict]) -> pd.DataFrame:
         """
@@ -161,34 +245,26 @@ class GitHubDataService:
                     self.logger.info(f"Processing commit {index}/{total_commits}")
                     
                 commit_data = {
-                    'sha': commit['sha'],
-                    'author': commit['commit']['author']['name'],
-                    'author_email': commit['commit']['author']['email'],
-                    'date': commit['commit']['author']['date'],
-                    'message': commit['commit']['message'],
-                    'url': commit['html_url'],
-                    'changed_files': None,
-                    'additions': None,
-                    'deletions': None
+                    'sha': commit['oid'],
+                    'author': commit['author']['name'],
+                    'author_email': commit['author']['email'],
+                    'date': commit['author']['date'],
+                    'message': commit['message'],
+                    'url': commit['url'],
+                    # additions + deletions, as the REST stats.total this column always held
+                    'changed_files': commit['additions'] + commit['deletions'],
+                    'additions': commit['additions'],
+                    'deletions': commit['deletions']
                 }
-                
-                # Get detailed commit information including stats
-                detailed_commit = self.get_detailed_commit(commit['url'])
-                if detailed_commit:
-                    commit_data.update({
-                        'changed_files': detailed_commit.get('stats', {}).get('total', 0),
-                        'additions': detailed_commit.get('stats', {}).get('additions', 0),
-                        'deletions': detailed_commit.get('stats', {}).get('deletions', 0)
-                    })
-                    
                 processed_commits.append(commit_data)
                 
             except KeyError as e:
-                self.logger.error(f"Error processing commit {commit.get('sha', 'unknown')}: {str(e)}")
+                self.logger.error(f"Error processing commit {commit.get('oid', 'unknown')}: {str(e)}")
                 continue
                 
         df = pd.DataFrame(processed_commits)
-        df['date'] = pd.to_datetime(df['date'])
+        # GraphQL author dates carry the committer's UTC offset, so normalize them to UTC
+        df['date'] = pd.to_datetime(df['date'], format='ISO8601', utc=True, errors='coerce')
         return df.sort_values('date', ascending=False)
 
     # [Previous Pull Requests and Issues methods remain the same]
@@ -209,30 +285,25 @@ class GitHubDataService:
         if not pull_requests:
             raise Exception("No pull requests to process")
             
-        processed_prs = []
-        
-        for pr in pull_requests:
-            pr_data = {
-                'number': pr['number'],
-                'title': pr['title'],
-                'state': pr['state'],
-                'created_at': pr['created_at'],
-                'updated_at': pr['updated_at'],
-                'closed_at': pr['closed_at'],
-                'merged_at': pr['merged_at'],
-                'author': pr['user']['login'],
-                'labels': [label['name'] for label in pr['labels']],
-                'commits': pr['commits'],
-                'additions': pr['additions'],
-                'deletions': pr['deletions'],
-                'changed_files': pr['changed_files'],
-                'url': pr['html_url']
-            }
-            processed_prs.append(pr_data)
-            
-        df = pd.DataFrame(processed_prs)
+        # Build the frame column by column rather than from one dict per row
+        df = pd.DataFrame({
+            'number': [pr['number'] for pr in pull_requests],
+            'title': [pr['title'] for pr in pull_requests],
+            'state': [pr['state'] for pr in pull_requests],
+            'created_at': [pr['created_at'] for pr in pull_requests],
+            'updated_at': [pr['updated_at'] for pr in pull_requests],
+            'closed_at': [pr['closed_at'] for pr in pull_requests],
+            'merged_at': [pr['merged_at'] for pr in pull_requests],
+            'author': [pr['user']['login'] for pr in pull_requests],
+            'labels': [[label['name'] for label in pr['labels']] for pr in pull_requests],
+            'commits': [pr['commits'] for pr in pull_requests],
+            'additions': [pr['additions'] for pr in pull_requests],
+            'deletions': [pr['deletions'] for pr in pull_requests],
+            'changed_files': [pr['changed_files'] for pr in pull_requests],
+            'url': [pr['html_url'] for pr in pull_requests]
+        })
         for date_column in ['created_at', 'updated_at', 'closed_at', 'merged_at']:
-            df[date_column] = pd.to_datetime(df[date_column])
+            df[date_column] = pd.to_datetime(df[date_column], format=GITHUB_DATE_FORMAT, utc=True, errors='coerce')
             
         return df.sort_values('created_at', ascending=False)
 
@@ -253,35 +324,29 @@ class GitHubDataService:
         """
         Process issues data into a pandas DataFrame.
         """
+        # Drop pull requests up front (GitHub considers PRs as issues)
+        issues = [issue for issue in issues if "pull_request" not in issue]
+        
         if not issues:
             raise Exception("No issues to process")
             
-        processed_issues = []
-        
-        for issue in issues:
-            # Skip pull requests (GitHub considers PRs as issues)
-            if "pull_request" in issue:
-                continue
-                
-            issue_data = {
-                'number': issue['number'],
-                'title': issue['title'],
-                'state': issue['state'],
-                'created_at': issue['created_at'],
-                'updated_at': issue['updated_at'],
-                'closed_at': issue['closed_at'],
-                'author': issue['user']['login'],
-                'labels': [label['name'] for label in issue['labels']],
-                'comments': issue['comments'],
-                'assignees': [assignee['login'] for assignee in issue['assignees']],
-                'milestone': issue['milestone']['title'] if issue['milestone'] else None,
-                'url': issue['html_url']
-            }
-            processed_issues.append(issue_data)
-            
-        df = pd.DataFrame(processed_issues)
+        # Build the frame column by column rather than from one dict per row
+        df = pd.DataFrame({
+            'number': [issue['number'] for issue in issues],
+            'title': [issue['title'] for issue in issues],
+            'state': [issue['state'] for issue in issues],
+            'created_at': [issue['created_at'] for issue in issues],
+            'updated_at': [issue['updated_at'] for issue in issues],
+            'closed_at': [issue['closed_at'] for issue in issues],
+            'author': [issue['user']['login'] for issue in issues],
+            'labels': [[label['name'] for label in issue.get('labels') or []] for issue in issues],
+            'comments': [issue['comments'] for issue in issues],
+            'assignees': [[assignee['login'] for assignee in issue.get('assignees') or []] for issue in issues],
+            'milestone': [issue['milestone']['title'] if issue['milestone'] else None for issue in issues],
+            'url': [issue['html_url'] for issue in issues]
+        })
         for date_column in ['created_at', 'updated_at', 'closed_at']:
-            df[date_column] = pd.to_datetime(df[date_column])
+            df[date_column] = pd.to_datetime(df[date_column], format=GITHUB_DATE_FORMAT, utc=True, errors='coerce')
             
         return df.sort_values('created_at', ascending=False)
 
@@ -305,6 +370,9 @@ class GitHubDataService:
         output_files = {}
         
         try:
+            if not self._check_repo_access(owner, repo):
+                raise Exception("Repository not accessible. Please check your permissions and token.")
+                
             if "commits" in data_types:
                 commits = self.get_commits(owner, repo, since, until)
                 commits_df = self.process_commits(commits)
@@ -340,8 +408,8 @@ if __name__ == "__main__":
         exit(1)
     
     try:
-        # Initialize the service
-        service = GitHubDataService(token)
+        # Initialize the service, reusing unchanged pages from previous runs
+        service = GitHubDataService(token, cache_path=".github_cache.sqlite")
         
         # Example repository
         owner = "prometheus-community"
@@ -0,0 +1,54 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class ETagCache:
+    def __init__(self, path: Optional[str] = None, max_age_days: int = 30):
+        """
+        On-disk store of the ETag, body and Link header of each fetched page, keyed by URL.
+        
+        Entries are read and written one page at a time, so pages are never all held in
+        memory. Entries not used for max_age_days are dropped when the cache is opened,
+        e.g. pages of since= queries that later runs no longer ask for.
+        
+        Args:
+            path (str): SQLite file to keep the cache in; with no path nothing is cached
+            max_age_days (int): Days an unused entry is kept
+        """
+        self._db = None
+        self._lock = threading.Lock()
+        if path is None:
+            return
+            
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages "
+            "(url TEXT PRIMARY KEY, etag TEXT, body BLOB, links TEXT, used_at REAL)"
+        )
+        self._db.execute("DELETE FROM pages WHERE used_at < ?", (time.time() - max_age_days * 86400,))
+
+    def get(self, url: str) -> Optional[Tuple[str, bytes, Dict[str, Dict]]]:
+        """
+        Return the cached (etag, body, links) of a page, if any.
+        """
+        if self._db is None:
+            return None
+        with self._lock:
+            entry = self._db.execute("SELECT etag, body, links FROM pages WHERE url = ?", (url,)).fetchone()
+            if entry is None:
+                return None
+            self._db.execute("UPDATE pages SET used_at = ? WHERE url = ?", (time.time(), url))
+        etag, body, links = entry
+        return etag, body, json.loads(links)
+
+    def put(self, url: str, etag: str, body: bytes, links: Dict[str, Dict]):
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, etag, body, json.dumps(links), time.time()),
+            )
@@ -0,0 +1,564 @@
+import requests
+import pandas as pd
+import os
+import csv
+import json
+from datetime import datetime
+from typing import Callable, List, Dict, Set, Union, Iterable, Iterator, Optional, Tuple
+import logging
+import time
+from abc import ABC, abstractmethod
+from urllib.parse import urlparse, parse_qs, urlencode
+from itertools import chain, islice
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rate_limit import TokenBucket
+from etag_cache import ETagCache
+
+# json_loads is shared with the other scrapers in this directory
+try:
+    import orjson
+    json_loads = orjson.loads
+
+    def _dump_line(row: Dict) -> bytes:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:  # orjson is optional; fall back to the standard library
+    json_loads = json.loads
+
+    def _dump_line(row: Dict) -> bytes:
+        return (json.dumps(row) + '\n').encode('utf-8')
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only needed for Parquet output
+    pa = None
+    pq = None
+
+GITHUB_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'  # REST API timestamps are always UTC with a Z suffix
+
+def _to_epoch_ms(timestamp: Optional[str]) -> Optional[int]:
+    """
+    Convert a GitHub ISO-8601 timestamp to epoch milliseconds.
+    """
+    if timestamp is None:
+        return None
+    return int(datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()) * 1000
+
+# Repositories found accessible, shared by every client in the process so that
+# running several scrapers against one repository probes it only once
+_ACCESS_CACHE: Set[Tuple[Tuple[str, ...], str, str]] = set()
+
+class GitHubClient(ABC):
+    """
+    Shared session, rate limit, caching and pagination logic for the GitHub scrapers.
+    
+    Subclasses declare the endpoint they page through and the columns they output,
+    and implement _project to turn one raw API record into an output row.
+    """
+    endpoint = ""  # e.g. "/repos/{owner}/{repo}/issues"
+    resource = ""  # plural name used in log and error messages, e.g. "issues"
+    item_name = ""  # singular name used in log and error messages, e.g. "issue"
+    id_field = "number"  # field identifying a record in error messages
+    empty_hint = ""  # appended to the error raised when the first page is empty
+    record_type = None  # optional records.Record schema of the fields _project reads
+    key_column = ""  # output column identifying a row when merging runs, e.g. "issue_number"
+    date_column = ""  # output column rows are ordered by, newest first
+    # Output column whose newest value the next incremental run fetches from. For endpoints
+    # not listed_by_date it is the key of the first row listed, which fetch walks down to
+    watermark_column = None
+    listed_by_date = True  # whether the endpoint lists records newest first by date_column
+    output_formats = ("json", "parquet")  # supported output formats, the first being the default
+    concurrent_pools = 1  # thread pools of max_workers that can share one session at the same time
+    # Output columns in file order, with their type: "int64", "string", "timestamp"
+    # (UTC, from datetimes or epoch milliseconds) or "list<string>"
+    output_columns: Dict[str, str] = {}
+
+    def __init__(self, tokens: Union[str, List[str]], max_workers: int = 8, cache_path: Optional[str] = None,
+                 state_dir: Optional[str] = None):
+        """
+        Initialize the GitHub API client.
+        
+        Args:
+            tokens (str | List[str]): One or more GitHub personal access tokens (required);
+                requests are spread across them, each with its own rate limit
+            max_workers (int): Number of concurrent requests
+            cache_path (str): Optional SQLite file used to persist ETags and pages between runs
+            state_dir (str): Optional directory remembering each run's watermark and output file,
+                so the next run only fetches what changed since
+        """
+        tokens = [tokens] if isinstance(tokens, str) else list(tokens)
+        if not tokens or not all(tokens):
+            raise ValueError("GitHub token is required for accessing repositories")
+            
+        self.max_workers = max_workers
+        self._tokens = tuple(tokens)
+        self.base_url = "https://api.github.com"
+        self.headers = {
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self.cache_path = cache_path
+        self.state_dir = state_dir
+        # One session per token, each paced by its own bucket:
+        # 5000 requests/hour sustained, with bursts of up to 100
+        self._clients = [
+            (self._setup_session(token), TokenBucket(rate=5000 / 3600, capacity=100))
+            for token in tokens
+        ]
+        self.logger = self._setup_logger()
+        self._etag_cache = ETagCache(cache_path)
+
+    def _setup_session(self, token: str) -> requests.Session:
+        """
+        Set up a requests session for one token with retry strategy and rate limit handling.
+        """
+        session = requests.Session()
+        retry_strategy = Retry(
+            total=5,  # number of retries
+            backoff_factor=1,  # wait 1, 2, 4, 8, 16 seconds between retries
+            status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
+        )
+        # One host, so a single pool; keep a connection alive for every worker thread
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=max(10, self.max_workers * self.concurrent_pools),
+            max_retries=retry_strategy,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        session.headers["Authorization"] = f"token {token}"
+        return session
+
+    def _setup_logger(self) -> logging.Logger:
+        """Set up logging configuration."""
+        logger = logging.getLogger(type(self).__name__)
+        logger.setLevel(logging.INFO)
+        
+        if not logger.handlers:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.addHandler(handler)
+            
+        return logger
+
+    @staticmethod
+    def _decode(response: requests.Response):
+        """
+        Decode a JSON response body, with orjson when it is installed.
+        """
+        return json_loads(response.content)
+
+    def _decode_records(self, content: bytes) -> List[Dict]:
+        """
+        Decode a page of records, keeping only the fields in record_type when msgspec is installed.
+        """
+        if self.record_type is None:
+            return json_loads(content)
+        return self.record_type.decode_list(content)
+
+    def _pick_client(self) -> Tuple[requests.Session, TokenBucket]:
+        """
+        Pick the token with the most rate limit budget left and take one request from it.
+        """
+        session, bucket = min(self._clients, key=lambda client: (client[1].wait_time(), -client[1].tokens))
+        bucket.acquire()
+        return session, bucket
+
+    def _handle_rate_limit(self, response: requests.Response, bucket: TokenBucket):
+        """
+        Handle GitHub API rate limiting.
+        
+        Args:
+            response (requests.Response): Response from GitHub API
+            bucket (TokenBucket): Bucket of the token that made the request
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            self.logger.warning(f"Secondary rate limit hit. Pausing token for {retry_after} seconds...")
+            bucket.pause(int(retry_after))
+            return
+            
+        remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
+        reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
+        if 'X-RateLimit-Remaining' in response.headers:
+            bucket.update(remaining)  # follow the budget the server reports
+            
+        if remaining <= 1:
+            wait_time = reset_time - int(time.time())
+            if wait_time > 0:
+                # Other tokens in the pool keep serving requests in the meantime
+                self.logger.warning(f"Rate limit nearly exceeded. Pausing token for {wait_time} seconds...")
+                bucket.pause(wait_time)
+
+    def _check_repo_access(self, owner: str, repo: str) -> bool:
+        """
+        Check if the repository is accessible with current credentials.
+        
+        Successful checks are cached per (tokens, owner, repo) for the lifetime of the
+        process. Failures are not, so a transient error is retried on the next call.
+        """
+        key = (self._tokens, owner, repo)
+        if key in _ACCESS_CACHE:
+            return True
+        if not self._probe_repo_access(owner, repo):
+            return False
+        _ACCESS_CACHE.add(key)
+        return True
+
+    def _probe_repo_access(self, owner: str, repo: str) -> bool:
+        url = f"{self.base_url}/repos/{owner}/{repo}"
+        session, bucket = self._pick_client()
+        response = session.get(url)
+        self._handle_rate_limit(response, bucket)
+        
+        if response.status_code == 200:
+            repo_data = self._decode(response)
+            self.logger.info(f"Successfully accessed repository: {repo_data['full_name']}")
+            self.logger.info(f"Repository visibility: {'private' if repo_data['private'] else 'public'}")
+            return True
+        else:
+            self.logger.error(f"Failed to access repository: {response.status_code} - {response.text}")
+            return False
+
+    def _watermark_path(self, name: str) -> Optional[str]:
+        if not self.state_dir:
+            return None
+        return os.path.join(self.state_dir, f"{name}.json")
+
+    def _load_watermark(self, name: str) -> Dict:
+        """
+        Load the watermark and output file of the previous run, if both are still there.
+        """
+        path = self._watermark_path(name)
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            if os.path.exists(state["output_path"]):
+                return state
+        return {}
+
+    def _save_watermark(self, name: str, since: Optional[str], output_path: str):
+        path = self._watermark_path(name)
+        if path and since:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"since": since, "output_path": output_path}, f)
+
+    def _fetch_page(self, page_url: str) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Fetch a single page of a paginated endpoint and return its data and Link header.
+        
+        page_url carries the full query string, which also keys the ETag cache.
+        Sends If-None-Match with the cached ETag and reuses the cached page on
+        304 Not Modified, which does not count against the rate limit.
+        Secondary rate limits are waited out and retried.
+        """
+        cached = self._etag_cache.get(page_url)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
+        for _ in range(3):
+            session, bucket = self._pick_client()
+            response = session.get(page_url, headers=headers)
+            self._handle_rate_limit(response, bucket)
+            # _handle_rate_limit has paused this token for Retry-After, so just try again
+            if response.status_code in (403, 429) and 'Retry-After' in response.headers:
+                continue
+            break
+            
+        if response.status_code == 304:
+            _, content, links = cached
+            return self._decode_records(content), links
+        response.raise_for_status()
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache.put(page_url, etag, response.content, response.links)
+        return self._decode_records(response.content), response.links
+
+    def _last_page(self, links: Dict[str, Dict]) -> Optional[int]:
+        """
+        Read the total number of pages from the Link: rel="last" header, if present.
+        """
+        last = links.get('last')
+        if last is None:
+            return None
+        return int(parse_qs(urlparse(last['url']).query)['page'][0])
+
+    def paginate(self, owner: str, repo: str, params: Dict, allow_empty: bool = False) -> Iterator[Dict]:
+        """
+        Yield every record of the endpoint for a repository, one page at a time, with rate limit handling.
+        
+        An empty first page raises unless allow_empty is set, e.g. when only
+        fetching what changed since the previous run.
+        """
+        if not self._check_repo_access(owner, repo):
+            raise Exception("Repository not accessible. Please check your permissions and token.")
+            
+        # Encode the query once; each page only appends its page number.
+        # Unset parameters are left out rather than sent as "None"
+        params = {key: value for key, value in params.items() if value is not None}
+        query = urlencode(sorted({**params, "per_page": 100}.items()))
+        url = f"{self.base_url}{self.endpoint.format(owner=owner, repo=repo)}?{query}"
+        total = 0
+        
+        try:
+            self.logger.info(f"Fetching page 1 of {self.resource}...")
+            page_items, links = self._fetch_page(f"{url}&page=1")
+            if not page_items and allow_empty:
+                self.logger.info(f"No new {self.resource} found")
+                return
+            if not page_items:
+                self.logger.warning(f"No {self.resource} found in the repository")
+                raise Exception(f"No {self.resource} found in the repository.{self.empty_hint}")
+                
+            total += len(page_items)
+            yield from page_items
+            
+            last_page = self._last_page(links)
+            if last_page is not None:
+                # The page count is known up front, so fetch the remaining pages concurrently,
+                # keeping at most max_workers pages in memory at a time
+                self.logger.info(f"Fetching pages 2-{last_page} of {self.resource} concurrently...")
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    for start in range(2, last_page + 1, self.max_workers):
+                        batch = range(start, min(start + self.max_workers, last_page + 1))
+                        for page_items, _ in executor.map(lambda page: self._fetch_page(f"{url}&page={page}"), batch):
+                            total += len(page_items)
+                            yield from page_items
+            else:
+                # No rel="last" advertised; follow rel="next" until the last page,
+                # rather than requesting one more page only to find it empty
+                page = 1
+                while 'next' in links:
+                    page += 1
+                    self.logger.info(f"Fetching page {page} of {self.resource}...")
+                    # The server-provided URL already carries the query and next page number
+                    page_items, links = self._fetch_page(links['next']['url'])
+                    total += len(page_items)
+                    yield from page_items
+                    
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error fetching {self.resource}: {str(e)}")
+            raise Exception(f"GitHub API error: {str(e)}")
+            
+        self.logger.info(f"Successfully fetched {total} {self.resource}")
+
+    @abstractmethod
+    def _project(self, item: Dict) -> Dict:
+        """
+        Turn one raw API record into an output row.
+        """
+
+    def _require_pyarrow(self):
+        if pa is None:
+            raise Exception("pyarrow is required for Parquet output")
+
+    def _read_parquet(self, path: str) -> List[Dict]:
+        self._require_pyarrow()
+        return pq.read_table(path).to_pylist()
+
+    def _write_parquet(self, rows: Iterable[Dict], output_path: str, row_group_size: int = 64 * 1024):
+        """
+        Write rows to a Zstd-compressed Parquet file, one row group at a time.
+        
+        Only row_group_size rows are held in memory, so this streams like the
+        line-by-line JSON and CSV writers.
+        """
+        self._require_pyarrow()
+        types = {
+            "int64": pa.int64(),
+            "string": pa.string(),
+            "timestamp": pa.timestamp('ms', tz='UTC'),
+            "list<string>": pa.list_(pa.string()),
+        }
+        # Declared up front so a column that is all null in the first row group keeps its type
+        schema = pa.schema([(name, types[kind]) for name, kind in self.output_columns.items()])
+        
+        rows = iter(rows)
+        with pq.ParquetWriter(output_path, schema, compression='zstd') as writer:
+            while True:
+                batch = list(islice(rows, row_group_size))
+                if not batch:
+                    break
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+    def iter_processed(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yield one output row per record, skipping records with missing fields.
+        """
+        processed = 0
+        for item in items:
+            try:
+                row = self._project(item)
+            except KeyError as e:
+                self.logger.error(f"Error processing {self.item_name} {item.get(self.id_field, 'unknown')}: {str(e)}")
+                continue
+                
+            processed += 1
+            yield row
+            
+        # One summary line instead of a progress line every 10 records
+        self.logger.info(f"Processed {processed} {self.resource}")
+
+    def _timestamp_columns(self) -> List[str]:
+        return [name for name, kind in self.output_columns.items() if kind == "timestamp"]
+
+    def _to_frame(self, rows: List[Dict]) -> pd.DataFrame:
+        """
+        Build a DataFrame of processed rows, newest first, with UTC datetime columns.
+        """
+        if not rows:
+            raise Exception(f"No {self.resource} could be processed successfully")
+            
+        # GitHub timestamps share one fixed-width UTC format, so sorting the strings
+        # gives the same order as sorting the parsed datetimes
+        rows.sort(key=itemgetter(self.date_column), reverse=True)
+        df = pd.DataFrame(rows)
+        # Explicit format skips per-column format inference
+        for date_column in self._timestamp_columns():
+            df[date_column] = pd.to_datetime(df[date_column], format=GITHUB_DATE_FORMAT, utc=True, errors='coerce')
+        return df
+
+    def _check_output_format(self, output_format: str):
+        if output_format not in self.output_formats:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        if output_format == 'parquet':
+            self._require_pyarrow()  # before any page is fetched
+
+    def save_rows(self, fetch: Callable[[Optional[str]], Iterable[Dict]], output_path: str,
+                  output_format: Optional[str] = None, watermark_name: Optional[str] = None,
+                  keep: Optional[Callable[[Dict], bool]] = None) -> str:
+        """
+        Stream processed rows straight into output_path instead of building a DataFrame.
+        
+        Args:
+            fetch (Callable): Called with the watermark to fetch from (None for everything);
+                returns the processed rows. When not listed_by_date, the watermark is a key
+                and fetch lists rows down to and including the row with that key
+            output_path (str): File to write
+            output_format (str): One of output_formats; defaults to the first
+            watermark_name (str): With a state_dir, only rows since the previous run saved
+                under this name are fetched and merged into the file that run wrote
+            keep (Callable): Filter applied to the rows fetched by an incremental run, for
+                deltas fetched without the server-side filter of a full run; a rejected row
+                is not written and drops the row the previous run saved under its key
+        """
+        output_format = output_format or self.output_formats[0]
+        self._check_output_format(output_format)
+        if watermark_name and output_format != self.output_formats[0]:
+            watermark_name += f"_{output_format}"  # each format merges into its own previous file
+            
+        previous = self._load_watermark(watermark_name) if watermark_name else {}
+        since = previous.get("since")
+        if since:
+            self.logger.info(f"Fetching {self.resource} since {since} into {previous['output_path']}")
+        latest = since
+        
+        def output_rows() -> Iterator[Dict]:
+            nonlocal latest
+            for index, row in enumerate(fetch(since)):
+                if self.watermark_column:
+                    value = row[self.watermark_column]
+                    if self.listed_by_date and (latest is None or value > latest):
+                        latest = value  # still an ISO-8601 string here
+                    elif not self.listed_by_date and index == 0:
+                        latest = value  # listed newest first, so the first row is the newest
+                yield self._to_output_row(row)
+                
+        rows = output_rows()
+        if since:
+            rows = self._merge_previous(rows, previous, output_format, keep)
+        first_row = next(rows, None)  # fetches the first page before the file is created
+        if first_row is None:
+            raise Exception(f"No {self.resource} could be processed successfully")
+            
+        # Written next to output_path and moved into place once every row is in, so a
+        # request failing on a later page leaves no truncated file behind
+        partial_path = output_path + ".tmp"
+        try:
+            self._write_rows(chain([first_row], rows), partial_path, output_format)
+            os.replace(partial_path, output_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+                
+        if watermark_name:
+            self._save_watermark(watermark_name, latest, output_path)
+        self.logger.info(f"{self.resource.capitalize()} saved to: {output_path}")
+        return output_path
+
+    def _to_output_row(self, row: Dict) -> Dict:
+        """
+        Convert a processed row to the form written to the output file.
+        """
+        # Timestamps as epoch milliseconds, as DataFrame.to_json wrote them
+        for date_column in self._timestamp_columns():
+            row[date_column] = _to_epoch_ms(row[date_column])
+        return row
+
+    def _from_saved_row(self, row: Dict, output_format: str) -> Dict:
+        """
+        Convert a row read back from a previous output file to the form _to_output_row returns.
+        """
+        if output_format == 'parquet':
+            for date_column in self._timestamp_columns():
+                if row[date_column] is not None:
+                    row[date_column] = int(row[date_column].timestamp()) * 1000
+        return row
+
+    def _write_rows(self, rows: Iterable[Dict], output_path: str, output_format: str):
+        if output_format == 'parquet':
+            self._write_parquet(rows, output_path)
+        elif output_format == 'csv':
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=list(self.output_columns), lineterminator='\n')
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(output_path, 'wb') as f:
+                for row in rows:
+                    f.write(_dump_line(row))  # Save one record per line
+
+    def _read_rows(self, path: str, output_format: str) -> Iterator[Dict]:
+        if output_format == 'parquet':
+            yield from self._read_parquet(path)
+        elif output_format == 'csv':
+            with open(path, newline='', encoding='utf-8') as f:
+                yield from csv.DictReader(f)
+        else:
+            with open(path, 'rb') as f:
+                yield from map(json_loads, f)
+
+    def _merge_previous(self, rows: Iterable[Dict], previous: Dict, output_format: str,
+                        keep: Optional[Callable[[Dict], bool]] = None) -> Iterator[Dict]:
+        """
+        Upsert freshly fetched output rows into the rows saved by the previous run.
+        
+        previous is the state _load_watermark returned. Its file is in output_format,
+        since watermarks are kept per format, and is read in full up front, so
+        output_path may be the same file.
+        Fresh rows rejected by keep replace their saved row but are not written.
+        With listed_by_date the result is sorted newest first by date_column, as a full
+        run lists it; otherwise the fresh rows come first, in API order, followed by the
+        saved rows that were not refetched.
+        """
+        fresh_rows = list(rows)
+        refetched = {row[self.key_column] for row in fresh_rows}
+        if not self.listed_by_date and previous["since"] not in refetched:
+            # The listing was walked to its end without reaching the watermark row,
+            # e.g. after rewritten history, so it is a full run on its own
+            self.logger.warning(f"{previous['since']} is no longer listed; replacing the previous {self.resource}")
+            return iter(fresh_rows)
+            
+        previous_path = previous["output_path"]
+        previous_rows = [self._from_saved_row(row, output_format) for row in self._read_rows(previous_path, output_format)]
+        if keep is not None:
+            fresh_rows = [row for row in fresh_rows if keep(row)]
+        merged = chain(fresh_rows, (row for row in previous_rows if row[self.key_column] not in refetched))
+        if self.listed_by_date:
+            return iter(sorted(merged, key=itemgetter(self.date_column), reverse=True))
+        return merged
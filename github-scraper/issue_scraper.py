@@ -1,143 +1,79 @@
-import requests
 import pandas as pd
 from datetime import datetime
-import os
-from typing import List, Dict, Optional
-import logging
-import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import List, Dict, Iterable, Iterator, Optional
+from github_client import GitHubClient
 
-class GitHubIssueService:
-    def __init__(self, token: str):
+try:
+    from records import Issue
+except ImportError:  # msgspec is optional; pages are then decoded in full
+    Issue = None
+
+class GitHubIssueService(GitHubClient):
+    endpoint = "/repos/{owner}/{repo}/issues"
+    resource = "issues"
+    record_type = Issue
+    item_name = "issue"
+    key_column = "issue_number"
+    date_column = "created_at"
+    watermark_column = "updated_at"  # since= filters on the last update
+    output_columns = {
+        'issue_number': 'int64',
+        'title': 'string',
+        'user': 'string',
+        'state': 'string',
+        'created_at': 'timestamp',
+        'updated_at': 'timestamp',
+        'closed_at': 'timestamp',
+        'url': 'string',
+        'comments': 'int64',
+        'labels': 'list<string>',
+        'assignee': 'string',
+    }
+
+    def iter_issues(self, owner: str, repo: str, state: Optional[str] = 'all',
+                    since: Optional[str] = None) -> Iterator[Dict]:
         """
-        Initialize the GitHub issue service.
+        Yield all issues from a specific repository, one page at a time, with rate limit handling.
         
-        Args:
-            token (str): GitHub personal access token for authentication (required)
+        With since, only issues updated at or after that time are fetched.
         """
-        if not token:
-            raise ValueError("GitHub token is required for accessing repositories")
-            
-        self.base_url = "https://api.github.com"
-        self.headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
+        params = {
+            "state": state,  # 'open', 'closed', or 'all'
+            "sort": "created",  # newest first, so streamed output keeps the old ordering
+            "direction": "desc"
         }
-        self.session = self._setup_session()
-        self.logger = self._setup_logger()
-        
-    def _setup_session(self) -> requests.Session:
-        """
-        Set up a requests session with retry strategy and rate limit handling.
-        """
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=5,  # number of retries
-            backoff_factor=1,  # wait 1, 2, 4, 8, 16 seconds between retries
-            status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        session.headers.update(self.headers)
-        return session
-        
-    def _setup_logger(self) -> logging.Logger:
-        """Set up logging configuration."""
-        logger = logging.getLogger("GitHubIssueService")
-        logger.setLevel(logging.INFO)
-        
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-            
-        return logger
-    
-    def _handle_rate_limit(self, response: requests.Response):
-        """
-        Handle GitHub API rate limiting.
-        
-        Args:
-            response (requests.Response): Response from GitHub API
-        """
-        remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-        reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-        
-        if remaining <= 1:
-            wait_time = reset_time - int(time.time())
-            if wait_time > 0:
-                self.logger.warning(f"Rate limit nearly exceeded. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-    
-    def _check_repo_access(self, owner: str, repo: str) -> bool:
-        """
-        Check if the repository is accessible with current credentials.
-        """
-        url = f"{self.base_url}/repos/{owner}/{repo}"
-        response = self.session.get(url)
-        
-        if response.status_code == 200:
-            repo_data = response.json()
-            self.logger.info(f"Successfully accessed repository: {repo_data['full_name']}")
-            self.logger.info(f"Repository visibility: {'private' if repo_data['private'] else 'public'}")
-            return True
-        else:
-            self.logger.error(f"Failed to access repository: {response.status_code} - {response.text}")
-            return False
+        if since:
+            params["since"] = since
+        return self.paginate(owner, repo, params, allow_empty=since is not None)
 
     def get_issues(self, owner: str, repo: str, state: Optional[str] = 'all') -> List[Dict]:
         """
         Fetch all issues from a specific repository with rate limit handling.
         """
-        if not self._check_repo_access(owner, repo):
-            raise Exception("Repository not accessible. Please check your permissions and token.")
-            
-        issues = []
-        page = 1
-        per_page = 100
-        
-        params = {
-            "state": state,  # 'open', 'closed', or 'all'
-            "per_page": per_page,
-            "page": page
+        return list(self.iter_issues(owner, repo, state))
+
+    def _project(self, issue: Dict) -> Dict:
+        # Safely access the optional fields
+        return {
+            'issue_number': issue['number'],
+            'title': issue['title'],
+            'user': issue['user']['login'],
+            'state': issue['state'],
+            'created_at': issue['created_at'],
+            'updated_at': issue['updated_at'],
+            'closed_at': issue.get('closed_at', None),  # Safely handle missing 'closed_at'
+            'url': issue['html_url'],
+            'comments': issue['comments'],
+            'labels': [label['name'] for label in issue.get('labels') or ()],  # Handle missing 'labels'
+            'assignee': (issue.get('assignee') or {}).get('login')  # Safely handle 'assignee'
         }
-            
-        while True:
-            url = f"{self.base_url}/repos/{owner}/{repo}/issues"
-            
-            self.logger.info(f"Fetching page {page} of issues...")
-            try:
-                response = self.session.get(url, params=params)
-                self._handle_rate_limit(response)
-                response.raise_for_status()
-                
-                page_issues = response.json()
-                self.logger.debug(f"Retrieved {len(page_issues)} issues from page {page}")
-                
-                if not page_issues:
-                    break
-                    
-                issues.extend(page_issues)
-                page += 1
-                params["page"] = page
-                
-                # Add a small delay between requests to be nice to GitHub's API
-                time.sleep(0.5)
-                
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error fetching issues: {str(e)}")
-                raise Exception(f"GitHub API error: {str(e)}")
-        
-        if not issues:
-            self.logger.warning("No issues found in the repository")
-            raise Exception("No issues found in the repository.")
-            
-        self.logger.info(f"Successfully fetched {len(issues)} issues")
-        return issues
-    
+
+    def iter_processed_issues(self, issues: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yield one processed record per issue, skipping issues with missing fields.
+        """
+        return self.iter_processed(issues)
+
     def process_issues(self, issues: List[Dict]) -> pd.DataFrame:
         """
         Process issues data into a pandas DataFrame.
@@ -145,43 +81,7 @@ class GitHubIssueService:
         if not issues:
             raise Exception("No issues to process")
             
-        processed_issues = []
-        total_issues = len(issues)
-        
-        for index, issue in enumerate(issues, 1):
-            try:
-                if index % 10 == 0:
-                    self.logger.info(f"Processing issue {index}/{total_issues}")
-
-                # Safely access the optional fields
-                issue_data = {
-                    'issue_number': issue['number'],
-                    'title': issue['title'],
-                    'user': issue['user']['login'],
-                    'state': issue['state'],
-                    'created_at': issue['created_at'],
-                    'updated_at': issue['updated_at'],
-                    'closed_at': issue.get('closed_at', None),  # Safely handle missing 'closed_at'
-                    'url': issue['html_url'],
-                    'comments': issue['comments'],
-                    'labels': [label['name'] for label in issue.get('labels', [])] if issue.get('labels') else [],  # Handle missing 'labels'
-                    'assignee': issue.get('assignee') and issue['assignee'].get('login')  # Safely handle 'assignee'
-                }
-                
-                processed_issues.append(issue_data)
-                
-            except KeyError as e:
-                self.logger.error(f"Error processing issue {issue.get('number', 'unknown')}: {str(e)}")
-                continue
-            
-        if not processed_issues:
-            raise Exception("No issues could be processed successfully")
-            
-        df = pd.DataFrame(processed_issues)
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df['updated_at'] = pd.to_datetime(df['updated_at'])
-        df['closed_at'] = pd.to_datetime(df['closed_at'])
-        return df.sort_values('created_at', ascending=False)
+        return self._to_frame(list(self.iter_processed_issues(issues)))
     
     # def save_issues_to_csv(self, owner: str, repo: str, output_path: str = None,
     #                        state: str = 'all') -> str:
@@ -199,20 +99,26 @@ class GitHubIssueService:
     #     return output_path
 
     def save_issues_to_json(self, owner: str, repo: str, output_path: str = None,
-                           state: str = 'all') -> str:
+                           state: str = 'all', output_format: str = 'json') -> str:
         """
         Get issues from a repository and save them to a JSON file.
-        """
-        issues = self.get_issues(owner, repo, state)
-        df = self.process_issues(issues)
         
+        output_format='parquet' writes a Zstd-compressed Parquet file instead.
+        With a state_dir, only issues updated since the previous run are fetched
+        and merged into the file that run wrote. That delta is fetched for every
+        state, so an issue that left the requested state since, e.g. was closed
+        in an export of open issues, is dropped from the file rather than kept stale.
+        """
         if output_path is None:
-            output_path = f"{owner}_{repo}_issues_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        # Save the DataFrame as a JSON file
-        df.to_json(output_path, orient='records', lines=True)  # Save one record per line
-        self.logger.info(f"Issues saved to: {output_path}")
-        return output_path
+            output_path = f"{owner}_{repo}_issues_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
+            
+        return self.save_rows(
+            lambda since: self.iter_processed_issues(self.iter_issues(owner, repo, 'all' if since else state, since)),
+            output_path,
+            output_format,
+            watermark_name=f"{owner}_{repo}_issues_{state}",
+            keep=None if state == 'all' else (lambda row: row['state'] == state)
+        )
 
 
 # Example usage
@@ -220,17 +126,20 @@ if __name__ == "__main__":
     import os
     from dotenv import load_dotenv
     
-    # Load token from environment variable
+    # Load tokens from environment variables
     load_dotenv()
-    token = os.getenv("GITHUB_TOKEN")
-    
-    if not token:
-        print("Please set GITHUB_TOKEN environment variable")
+    # GITHUB_TOKENS may hold a comma-separated pool of tokens
+    tokens = [token for token in os.getenv("GITHUB_TOKENS", "").split(",") if token]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+        
+    if not tokens:
+        print("Please set GITHUB_TOKEN (or GITHUB_TOKENS) environment variable")
         exit(1)
     
     try:
-        # Initialize the service with token
-        service = GitHubIssueService(token)
+        # Initialize the service with the token pool
+        service = GitHubIssueService(tokens, cache_path=".github_issues_cache.sqlite", state_dir=".github_scraper_state")
         
         # Example repository (replace with your repository details)
         owner = "prometheus-community"
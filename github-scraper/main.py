@@ -1,161 +1,147 @@
 import requests
 import pandas as pd
 from datetime import datetime
-import os
-from typing import List, Dict, Optional
-import logging
-from urllib.parse import urlparse
-import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import List, Dict, Iterable, Iterator, Optional
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from github_client import GitHubClient
 
-class GitHubCommitService:
-    def __init__(self, token: str):
-        """
-        Initialize the GitHub commit service.
-        
-        Args:
-            token (str): GitHub personal access token for authentication (required)
-        """
-        if not token:
-            raise ValueError("GitHub token is required for accessing repositories")
-            
-        self.base_url = "https://api.github.com"
-        self.headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        self.session = self._setup_session()
-        self.logger = self._setup_logger()
-        
-    def _setup_session(self) -> requests.Session:
+try:
+    from records import Commit
+except ImportError:  # msgspec is optional; pages are then decoded in full
+    Commit = None
+
+try:
+    import ijson
+    _STATS_ERRORS = (requests.exceptions.RequestException, ValueError, ijson.JSONError)
+except ImportError:  # ijson is optional; commit details are then decoded in full
+    ijson = None
+    _STATS_ERRORS = (requests.exceptions.RequestException, ValueError)
+
+class GitHubCommitService(GitHubClient):
+    endpoint = "/repos/{owner}/{repo}/commits"
+    resource = "commits"
+    record_type = Commit
+    item_name = "commit"
+    id_field = "sha"
+    empty_hint = " Please check if the repository is empty or if the date range is correct."
+    key_column = "sha"
+    date_column = "date"
+    watermark_column = "sha"  # newest commit of the previous run; see save_commits_to_csv
+    listed_by_date = False  # newest first along the history, not strictly by author date
+    output_formats = ("csv", "parquet")
+    stats_drain_limit = 1024 * 1024  # decompressed bytes; see get_commit_stats
+    concurrent_pools = 2  # the page fan-out and the commit detail fetches run side by side
+    output_columns = {
+        'sha': 'string',
+        'author': 'string',
+        'author_email': 'string',
+        'date': 'timestamp',
+        'message': 'string',
+        'url': 'string',
+        'changed_files': 'int64',
+        'additions': 'int64',
+        'deletions': 'int64',
+    }
+
+    def iter_commits(self, owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
         """
-        Set up a requests session with retry strategy and rate limit handling.
+        Yield all commits from a specific repository, one page at a time, with rate limit handling.
         """
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=5,  # number of retries
-            backoff_factor=1,  # wait 1, 2, 4, 8, 16 seconds between retries
-            status_forcelist=[429, 500, 502, 503, 504],  # HTTP status codes to retry on
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        session.headers.update(self.headers)
-        return session
-        
-    def _setup_logger(self) -> logging.Logger:
-        """Set up logging configuration."""
-        logger = logging.getLogger("GitHubCommitService")
-        logger.setLevel(logging.INFO)
+        params = {}
         
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
+        if since:
+            params["since"] = since
+        if until:
+            params["until"] = until
             
-        return logger
-    
-    def _handle_rate_limit(self, response: requests.Response):
-        """
-        Handle GitHub API rate limiting.
-        
-        Args:
-            response (requests.Response): Response from GitHub API
+        return self.paginate(owner, repo, params)
+
+    def get_commits(self, owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
         """
-        remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
-        reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-        
-        if remaining <= 1:
-            wait_time = reset_time - int(time.time())
-            if wait_time > 0:
-                self.logger.warning(f"Rate limit nearly exceeded. Waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-    
-    def _check_repo_access(self, owner: str, repo: str) -> bool:
+        Fetch all commits from a specific repository with rate limit handling.
         """
-        Check if the repository is accessible with current credentials.
+        return list(self.iter_commits(owner, repo, since, until))
+
+    def get_commit_stats(self, commit_url: str) -> Optional[Dict]:
         """
-        url = f"{self.base_url}/repos/{owner}/{repo}"
-        response = self.session.get(url)
+        Get the stats (total, additions, deletions) of a specific commit.
         
-        if response.status_code == 200:
-            repo_data = response.json()
-            self.logger.info(f"Successfully accessed repository: {repo_data['full_name']}")
-            self.logger.info(f"Repository visibility: {'private' if repo_data['private'] else 'public'}")
-            return True
-        else:
-            self.logger.error(f"Failed to access repository: {response.status_code} - {response.text}")
-            return False
-
-    def get_commits(self, owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Dict]:
+        With ijson installed the body is streamed and only the stats subtree is parsed;
+        GitHub sends stats ahead of the files array. Up to stats_drain_limit more bytes
+        are then read and discarded, counted after gzip decoding, so the limit holds
+        whether the response has a Content-Length or is chunked. A body that ends within
+        the limit puts the connection back in the pool for the next request. Longer
+        ones, i.e. commits with large patches, are closed instead, which costs a new
+        connection but skips downloading the rest. On a typical link, reading 1 MiB
+        takes about as long as the round trips of a new TLS connection, and most
+        commit details are well below it.
         """
-        Fetch all commits from a specific repository with rate limit handling.
+        try:
+            session, bucket = self._pick_client()
+            with session.get(commit_url, stream=True) as response:
+                self._handle_rate_limit(response, bucket)
+                response.raise_for_status()
+                if ijson is None:
+                    detailed_commit = self._decode(response) if Commit is None else Commit.decode(response.content)
+                    return detailed_commit.get('stats')
+                    
+                response.raw.decode_content = True  # let urllib3 undo the gzip encoding
+                stats = next(ijson.items(response.raw, 'stats'), None)
+                drained = 0
+                while drained <= self.stats_drain_limit:
+                    chunk = response.raw.read(64 * 1024)
+                    if not chunk:
+                        break  # whole body read, so the connection is reused
+                    drained += len(chunk)
+                return stats
+        except _STATS_ERRORS as e:
+            self.logger.error(f"Error fetching detailed commit info: {str(e)}")
+            return None
+
+    def _iter_detailed_commits(self, commits: Iterable[Dict], batch_size: int) -> Iterator[Dict]:
         """
-        if not self._check_repo_access(owner, repo):
-            raise Exception("Repository not accessible. Please check your permissions and token.")
-            
-        commits = []
-        page = 1
-        per_page = 100
+        Attach the stats from the detail endpoint to each commit, overlapping the requests across a thread pool.
         
-        params = {
-            "per_page": per_page,
-            "page": page
-        }
+        Commits whose stats could not be fetched are passed through without them.
+        """
+        commits = iter(commits)
         
-        if since:
-            params["since"] = since
-        if until:
-            params["until"] = until
-            
-        while True:
-            url = f"{self.base_url}/repos/{owner}/{repo}/commits"
-            
-            self.logger.info(f"Fetching page {page} of commits...")
-            try:
-                response = self.session.get(url, params=params)
-                self._handle_rate_limit(response)
-                response.raise_for_status()
-                
-                page_commits = response.json()
-                self.logger.debug(f"Retrieved {len(page_commits)} commits from page {page}")
-                
-                if not page_commits:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                batch = list(islice(commits, batch_size))
+                if not batch:
                     break
                     
-                commits.extend(page_commits)
-                page += 1
-                params["page"] = page
-                
-                # Add a small delay between requests to be nice to GitHub's API
-                time.sleep(0.5)
-                
-            except requests.exceptions.RequestException as e:
-                self.logger.error(f"Error fetching commits: {str(e)}")
-                raise Exception(f"GitHub API error: {str(e)}")
-        
-        if not commits:
-            self.logger.warning("No commits found in the repository")
-            raise Exception("No commits found in the repository. Please check if the repository is empty or if the date range is correct.")
-            
-        self.logger.info(f"Successfully fetched {len(commits)} commits")
-        return commits
-    
-    def get_detailed_commit(self, commit_url: str) -> Dict:
+                commit_stats = executor.map(
+                    self.get_commit_stats, [commit['url'] for commit in batch]
+                )
+                for commit, stats in zip(batch, commit_stats):
+                    yield commit if stats is None else {**commit, 'stats': stats}
+
+    def _project(self, commit: Dict) -> Dict:
+        # Detailed commit information including stats
+        stats = commit.get('stats')
+        return {
+            'sha': commit['sha'],
+            'author': commit['commit']['author']['name'],
+            'author_email': commit['commit']['author']['email'],
+            'date': commit['commit']['author']['date'],
+            'message': commit['commit']['message'],
+            'url': commit['html_url'],
+            'changed_files': stats.get('total', 0) if stats is not None else None,
+            'additions': stats.get('additions', 0) if stats is not None else None,
+            'deletions': stats.get('deletions', 0) if stats is not None else None
+        }
+
+    def iter_processed_commits(self, commits: Iterable[Dict], batch_size: int = 100) -> Iterator[Dict]:
         """
-        Get detailed information about a specific commit.
+        Yield one processed record per commit, including stats from the detail endpoint.
+        
+        Detail requests are overlapped across a thread pool, batch_size commits at a time.
         """
-        try:
-            response = self.session.get(commit_url)
-            self._handle_rate_limit(response)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Error fetching detailed commit info: {str(e)}")
-            return None
-    
+        return self.iter_processed(self._iter_detailed_commits(commits, batch_size))
+        
     def process_commits(self, commits: List[Dict]) -> pd.DataFrame:
         """
         Process commits data into a pandas DataFrame.
@@ -163,79 +149,81 @@ class GitHubCommitService:
         if not commits:
             raise Exception("No commits to process")
             
-        processed_commits = []
-        total_commits = len(commits)
-        
-        for index, commit in enumerate(commits, 1):
-            try:
-                if index % 10 == 0:
-                    self.logger.info(f"Processing commit {index}/{total_commits}")
-                    
-                commit_data = {
-                    'sha': commit['sha'],
-                    'author': commit['commit']['author']['name'],
-                    'author_email': commit['commit']['author']['email'],
-                    'date': commit['commit']['author']['date'],
-                    'message': commit['commit']['message'],
-                    'url': commit['html_url'],
-                    'changed_files': None,
-                    'additions': None,
-                    'deletions': None
-                }
-                
-                # Get detailed commit information including stats
-                detailed_commit = self.get_detailed_commit(commit['url'])
-                if detailed_commit:
-                    commit_data.update({
-                        'changed_files': detailed_commit.get('stats', {}).get('total', 0),
-                        'additions': detailed_commit.get('stats', {}).get('additions', 0),
-                        'deletions': detailed_commit.get('stats', {}).get('deletions', 0)
-                    })
-                    
-                processed_commits.append(commit_data)
-                
-            except KeyError as e:
-                self.logger.error(f"Error processing commit {commit.get('sha', 'unknown')}: {str(e)}")
-                continue
-            
-        if not processed_commits:
-            raise Exception("No commits could be processed successfully")
-            
-        df = pd.DataFrame(processed_commits)
-        df['date'] = pd.to_datetime(df['date'])
-        return df.sort_values('date', ascending=False)
+        return self._to_frame(list(self.iter_processed_commits(commits)))
     
     def save_commits_to_csv(self, owner: str, repo: str, output_path: str = None,
-                          since: str = None, until: str = None) -> str:
+                          since: str = None, until: str = None, output_format: str = 'csv') -> str:
         """
         Get commits from a repository and save them to a CSV file.
-        """
-        commits = self.get_commits(owner, repo, since, until)
-        df = self.process_commits(commits)
         
+        Commits are written in the order the API lists them: newest first along the
+        history, which is not strictly author-date order. output_format='parquet'
+        writes a Zstd-compressed Parquet file instead.
+        With a state_dir and no explicit date range, the listing is only walked down to
+        the newest commit the previous run saved, rather than filtered by date, and the
+        commits above it are written ahead of the ones that run saved. Commits merged
+        in since are picked up as long as the API lists them above that commit; any it
+        lists further down, e.g. from a long-lived branch with older commit dates, are
+        only picked up by a full run. If that commit is no longer in the history, e.g.
+        after a force push, the whole listing is written as a full run.
+        """
+        def fetch(watermark: Optional[str]) -> Iterator[Dict]:
+            commits = self.iter_commits(owner, repo, since, until)
+            if watermark:
+                commits = self._until_commit(commits, watermark)
+            return self.iter_processed_commits(commits)
+            
         if output_path is None:
-            output_path = f"{owner}_{repo}_commits_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            output_path = f"{owner}_{repo}_commits_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{output_format}"
             
-        df.to_csv(output_path, index=False)
-        self.logger.info(f"Commits saved to: {output_path}")
-        return output_path
+        # An explicit date range is a one-off export, not an incremental run
+        incremental = since is None and until is None
+        return self.save_rows(
+            fetch, output_path, output_format, watermark_name=f"{owner}_{repo}_commits" if incremental else None
+        )
+
+    @staticmethod
+    def _until_commit(commits: Iterable[Dict], sha: str) -> Iterator[Dict]:
+        """
+        Yield commits down to and including the one with the given sha.
+        
+        Stopping here, before the detail requests, keeps an incremental run to one
+        detail request per new commit plus one for the commit it stops at.
+        """
+        for commit in commits:
+            yield commit
+            if commit['sha'] == sha:
+                return
+
+    def _to_output_row(self, row: Dict) -> Dict:
+        # Same "YYYY-MM-DD HH:MM:SS+00:00" form DataFrame.to_csv wrote
+        row['date'] = datetime.fromisoformat(row['date'].replace('Z', '+00:00'))
+        return row
+
+    def _from_saved_row(self, row: Dict, output_format: str) -> Dict:
+        if output_format == 'csv':
+            row['date'] = datetime.fromisoformat(row['date'])
+        return row
 
 # Example usage
 if __name__ == "__main__":
     import os
     from dotenv import load_dotenv
     
-    # Load token from environment variable
+    # Load tokens from environment variables
     load_dotenv()
-    token = os.getenv("GITHUB_TOKEN")
-    
-    if not token:
-        print("Please set GITHUB_TOKEN environment variable")
+    # GITHUB_TOKENS may hold a comma-separated pool of tokens
+    tokens = [token for token in os.getenv("GITHUB_TOKENS", "").split(",") if token]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+        
+    if not tokens:
+        print("Please set GITHUB_TOKEN (or GITHUB_TOKENS) environment variable")
         exit(1)
     
     try:
-        # Initialize the service with token
-        service = GitHubCommitService(token)
+        # Initialize the service with the token pool
+        service = GitHubCommitService(tokens, cache_path=".github_commits_cache.sqlite", state_dir=".github_scraper_state")
         
         # Example repository (replace with your repository details)
         owner = "lura00"
@@ -0,0 +1,63 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        """
+        Thread-safe token bucket used to pace requests against the GitHub rate limit.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens, i.e. the largest allowed burst
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self) -> float:
+        return max(self._paused_until - time.monotonic(), (1 - self.tokens) / self.rate, 0)
+
+    def wait_time(self) -> float:
+        """
+        Seconds until a token can be taken.
+        """
+        with self._lock:
+            self._refill()
+            return self._wait_time()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                wait_time = self._wait_time()
+                if wait_time == 0:
+                    self.tokens -= 1
+                    return
+            time.sleep(wait_time)
+
+    def pause(self, seconds: float):
+        """
+        Hand out no tokens for the given number of seconds, e.g. until the rate limit resets.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def update(self, remaining: int):
+        """
+        Resynchronize the bucket with the budget reported by X-RateLimit-Remaining.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, remaining)
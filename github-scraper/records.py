@@ -0,0 +1,82 @@
+"""
+msgspec schemas listing only the fields the scrapers keep from each API record.
+
+Decoding against these skips every other field while parsing, instead of
+building the full (40+ field) dicts and discarding most of them. Fields are
+UNSET when missing from the payload and are then left out of the decoded
+dict, so a record without a required field still raises KeyError in
+_project and is skipped as before.
+"""
+from typing import Any, Dict, List, Optional, Union
+import msgspec
+from msgspec import UNSET, UnsetType
+
+class Record(msgspec.Struct):
+    @classmethod
+    def decode(cls, content: bytes) -> Dict:
+        """
+        Decode one JSON object into a plain dict holding only the declared fields.
+        """
+        return msgspec.to_builtins(msgspec.json.decode(content, type=cls))
+
+    @classmethod
+    def decode_list(cls, content: bytes) -> List[Dict]:
+        """
+        Decode a JSON array of objects into plain dicts holding only the declared fields.
+        """
+        return msgspec.to_builtins(msgspec.json.decode(content, type=List[cls]))
+
+class User(Record):
+    login: Any = UNSET
+
+class Label(Record):
+    name: Any = UNSET
+
+class Issue(Record):
+    number: Any = UNSET
+    title: Any = UNSET
+    user: Union[Optional[User], UnsetType] = UNSET
+    state: Any = UNSET
+    created_at: Any = UNSET
+    updated_at: Any = UNSET
+    closed_at: Any = UNSET
+    html_url: Any = UNSET
+    comments: Any = UNSET
+    labels: Union[Optional[List[Label]], UnsetType] = UNSET
+    assignee: Union[Optional[User], UnsetType] = UNSET
+
+class PullRequest(Record):
+    number: Any = UNSET
+    title: Any = UNSET
+    user: Union[Optional[User], UnsetType] = UNSET
+    state: Any = UNSET
+    created_at: Any = UNSET
+    updated_at: Any = UNSET
+    merged_at: Any = UNSET
+    html_url: Any = UNSET
+    comments: Any = UNSET
+    review_comments: Any = UNSET
+    additions: Any = UNSET
+    deletions: Any = UNSET
+    changed_files: Any = UNSET
+
+class CommitAuthor(Record):
+    name: Any = UNSET
+    email: Any = UNSET
+    date: Any = UNSET
+
+class CommitDetails(Record):
+    author: Union[Optional[CommitAuthor], UnsetType] = UNSET
+    message: Any = UNSET
+
+class CommitStats(Record):
+    total: Any = UNSET
+    additions: Any = UNSET
+    deletions: Any = UNSET
+
+class Commit(Record):
+    sha: Any = UNSET
+    url: Any = UNSET
+    html_url: Any = UNSET
+    commit: Union[Optional[CommitDetails], UnsetType] = UNSET
+    stats: Union[Optional[CommitStats], UnsetType] = UNSET  # only on the single-commit endpoint
@@ -0,0 +1,189 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from urllib.parse import urlparse, parse_qs, urlencode
+
+import requests
+
+from issue_scraper import GitHubIssueService
+from main import GitHubCommitService
+
+
+def _response(body, status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode('utf-8')
+    response.raw = io.BytesIO(response._content)
+    return response
+
+
+def _issue(number: int, state: str, updated_at: str):
+    return {
+        'number': number,
+        'title': f"Issue {number}",
+        'user': {'login': 'octocat'},
+        'state': state,
+        'created_at': f"2024-01-{number:02d}T00:00:00Z",
+        'updated_at': updated_at,
+        'closed_at': updated_at if state == 'closed' else None,
+        'html_url': f"https://github.com/owner/repo/issues/{number}",
+        'comments': 0,
+        'labels': [],
+        'assignee': None,
+    }
+
+
+def _commit(sha: str, date: str):
+    return {
+        'sha': sha,
+        'url': f"https://api.github.com/repos/owner/repo/commits/{sha}",
+        'html_url': f"https://github.com/owner/repo/commit/{sha}",
+        'commit': {'author': {'name': 'Octo Cat', 'email': 'octocat@example.com', 'date': date}, 'message': sha},
+    }
+
+
+class FakeGitHub:
+    """
+    Serves the repository probe, the commit detail endpoint and a listing of whatever
+    listing(query) returns, in pages of page_size linked by rel="next".
+    """
+    def __init__(self, listing, page_size: int = 100):
+        self.listing = listing
+        self.page_size = page_size
+        self.failing_page = None
+        self.queries = []
+        self.details = []
+
+    def get(self, session, url, **kwargs):
+        parsed = urlparse(url)
+        if parsed.path == "/repos/owner/repo":
+            return _response({'full_name': 'owner/repo', 'private': False})
+        if parsed.path.startswith("/repos/owner/repo/commits/"):
+            sha = parsed.path.rsplit('/', 1)[1]
+            self.details.append(sha)
+            return _response({'sha': sha, 'stats': {'total': 3, 'additions': 2, 'deletions': 1}, 'files': []})
+            
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        self.queries.append(query)
+        page = int(query['page'])
+        if page == self.failing_page:
+            return _response({'message': 'Server Error'}, 500)
+            
+        items = self.listing(query)
+        response = _response(items[(page - 1) * self.page_size:page * self.page_size])
+        if page * self.page_size < len(items):
+            next_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{urlencode({**query, 'page': page + 1})}"
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+        return response
+
+
+class IncrementalIssuesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = GitHubIssueService("token", state_dir=os.path.join(self.tmp.name, "state"))
+        self.issues = [
+            _issue(1, 'open', "2024-02-01T00:00:00Z"),
+            _issue(2, 'open', "2024-02-02T00:00:00Z"),
+        ]
+        self.github = FakeGitHub(self._list_issues)
+        patcher = mock.patch.object(requests.Session, "get", autospec=True, side_effect=self.github.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _list_issues(self, query):
+        # The state and since filters, as the API applies them
+        issues = [
+            issue for issue in self.issues
+            if query['state'] in ('all', issue['state']) and issue['updated_at'] >= query.get('since', '')
+        ]
+        return sorted(issues, key=lambda issue: issue['created_at'], reverse=True)
+
+    def _save(self, name: str, state: str):
+        path = self.service.save_issues_to_json("owner", "repo", os.path.join(self.tmp.name, name), state=state)
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def _update(self, number: int, state: str, updated_at: str):
+        self.issues[number - 1] = _issue(number, state, updated_at)
+
+    def test_second_run_fetches_since_the_newest_update(self):
+        self._save("first.json", 'all')
+        self._update(1, 'closed', "2024-03-01T00:00:00Z")
+        self.issues.append(_issue(3, 'open', "2024-03-02T00:00:00Z"))
+        
+        rows = self._save("second.json", 'all')
+        
+        self.assertEqual(self.github.queries[-1]['since'], "2024-02-02T00:00:00Z")
+        self.assertEqual([(row['issue_number'], row['state']) for row in rows],
+                         [(3, 'open'), (2, 'open'), (1, 'closed')])
+
+    def test_issue_closed_since_is_dropped_from_open_export(self):
+        self.assertEqual([row['issue_number'] for row in self._save("first.json", 'open')], [2, 1])
+        self._update(1, 'closed', "2024-03-01T00:00:00Z")
+        
+        rows = self._save("second.json", 'open')
+        
+        self.assertEqual(self.github.queries[-1]['state'], 'all')
+        self.assertEqual([(row['issue_number'], row['state']) for row in rows], [(2, 'open')])
+
+    def test_run_with_no_changes_rewrites_previous_rows(self):
+        first = self._save("first.json", 'all')
+        
+        self.assertEqual(self._save("second.json", 'all'), first)
+
+    def test_failed_page_leaves_the_existing_file_alone(self):
+        path = os.path.join(self.tmp.name, "issues.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("previous\n")
+        self.github.page_size = 1
+        self.github.failing_page = 2
+        
+        with self.assertRaisesRegex(Exception, "GitHub API error"):
+            self.service.save_issues_to_json("owner", "repo", path)
+            
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "previous\n")
+        self.assertFalse(os.path.exists(path + ".tmp"))
+
+
+class IncrementalCommitsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = GitHubCommitService("token", max_workers=2, state_dir=os.path.join(self.tmp.name, "state"))
+        # Newest first along the history
+        self.commits = [_commit("c2", "2024-02-02T00:00:00Z"), _commit("c0", "2024-01-01T00:00:00Z")]
+        self.github = FakeGitHub(lambda query: self.commits)
+        patcher = mock.patch.object(requests.Session, "get", autospec=True, side_effect=self.github.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _save(self, name: str):
+        path = self.service.save_commits_to_csv("owner", "repo", os.path.join(self.tmp.name, name))
+        with open(path, newline='', encoding='utf-8') as f:
+            return [row['sha'] for row in csv.DictReader(f)]
+
+    def test_second_run_walks_down_to_the_previous_newest_commit(self):
+        self.assertEqual(self._save("first.csv"), ["c2", "c0"])
+        # c1 was merged in since, with an older date than c2
+        self.commits[:0] = [_commit("c3", "2024-03-01T00:00:00Z"), _commit("c1", "2024-01-15T00:00:00Z")]
+        self.github.details.clear()
+        
+        self.assertEqual(self._save("second.csv"), ["c3", "c1", "c2", "c0"])
+        self.assertNotIn('since', self.github.queries[-1])
+        self.assertEqual(self.github.details, ["c3", "c1", "c2"])
+
+    def test_rewritten_history_replaces_previous_commits(self):
+        self._save("first.csv")
+        self.commits = [_commit("c4", "2024-03-01T00:00:00Z"), _commit("c0", "2024-01-01T00:00:00Z")]
+        
+        self.assertEqual(self._save("second.csv"), ["c4", "c0"])
+
+
+if __name__ == "__main__":
+    unittest.main()